@@ -1,10 +1,17 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel, Field
-from typing import Dict, Any, List
+from typing import List, Tuple
+from bisect import bisect_right
 import numpy as np
-from datetime import datetime
+from datetime import datetime, timezone
 import json
 
+try:
+    from numba import njit
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+
 app = FastAPI(
     title="Network Performance Optimizer",
     description="Final Year Project - Advanced Network Performance Optimization System",
@@ -24,50 +31,151 @@ class NetworkAnalysis(BaseModel):
     performance_rating: str
     recommendations: List[str]
 
-def analyze_network(conditions: NetworkConditions) -> NetworkAnalysis:
+class VideoQuality(BaseModel):
+    resolution: str
+    fps: int
+    bitrate: str
+    codec: str
+    streaming_quality: str
+
+class BandwidthOptimization(BaseModel):
+    current_bandwidth: float
+    recommended_bandwidth: float
+    potential_improvement: float
+
+class AnalyzeResponse(BaseModel):
+    timestamp: datetime = Field(..., description="Response time in UTC, ISO 8601 with a 'Z' suffix")
+    input_conditions: NetworkConditions
+    analysis_results: NetworkAnalysis
+    optimization: BandwidthOptimization
+    video_streaming: VideoQuality
+    status: str
+
+class CurrentConditions(BaseModel):
+    bandwidth: float
+    throughput: float
+    packet_loss: float
+    latency: float
+    jitter: float
+    current_congestion: float
+    current_score: float
+
+class OptimizationStep(BaseModel):
+    bandwidth: float
+    predicted_score: float
+    congestion_level: str
+    video_quality: VideoQuality
+
+class PerformanceMetrics(BaseModel):
+    bandwidth_improvement: float
+    quality_improvement: float
+    network_efficiency: float
+
+class OptimalConfiguration(BaseModel):
+    bandwidth: float
+    predicted_score: float
+    predicted_congestion: str
+    congestion_reduction: float
+    video_quality: VideoQuality
+    performance_metrics: PerformanceMetrics
+
+class OptimizeResponse(BaseModel):
+    timestamp: datetime = Field(..., description="Response time in UTC, ISO 8601 with a 'Z' suffix")
+    current_conditions: CurrentConditions
+    optimal_configuration: OptimalConfiguration
+    step_by_step_optimization: List[OptimizationStep]
+    recommendations: List[str]
+    status: str
+
+# Score thresholds separating the congestion buckets (Severe, High, Moderate, Low)
+_CONGESTION_THRESHOLDS = (40, 60, 80)
+_CONGESTION_LEVELS = ["Severe", "High", "Moderate", "Low"]
+_RATING_THRESHOLDS = (40, 60, 75, 90)
+_RATING_LEVELS = ["Critical", "Poor", "Fair", "Good", "Excellent"]
+
+# Video profile per congestion bucket: (resolution, fps, codec, quality, bitrate multiplier, bitrate cap)
+_VIDEO_PROFILES = [
+    ("480p", 24, "H.264/AVC", "Low", 0.5, 4),
+    ("720p", 30, "H.264/AVC", "Medium", 0.6, 8),
+    ("1080p", 30, "H.264/AVC", "High", 0.7, 15),
+    ("4K (2160p)", 60, "H.265/HEVC", "Ultra High", 0.8, 35),
+]
+
+def _compute_score(bw: float, thr: float, pl: float, lat: float, jit: float) -> float:
     # Calculate network score (0-100)
     score = 100.0
-    score -= conditions.packet_loss * 2  # Packet loss impact
-    score -= conditions.latency * 0.5    # Latency impact
-    score -= conditions.jitter * 5       # Jitter impact
-    score += conditions.throughput * 20  # Throughput positive impact
-    score += min(conditions.bandwidth * 5, 30)  # Bandwidth positive impact (capped)
+    score -= pl * 2           # Packet loss impact
+    score -= lat * 0.5        # Latency impact
+    score -= jit * 5          # Jitter impact
+    score += thr * 20         # Throughput positive impact
+    score += min(bw * 5, 30)  # Bandwidth positive impact (capped)
     
     # Normalize score
-    score = max(0, min(100, score))
-    
-    # Determine congestion level
-    if score >= 80:
-        congestion = "Low"
-    elif score >= 60:
-        congestion = "Moderate"
-    elif score >= 40:
-        congestion = "High"
-    else:
-        congestion = "Severe"
-    
-    # Performance rating
-    if score >= 90:
-        rating = "Excellent"
-    elif score >= 75:
-        rating = "Good"
-    elif score >= 60:
-        rating = "Fair"
-    elif score >= 40:
-        rating = "Poor"
-    else:
-        rating = "Critical"
-    
-    # Generate recommendations
+    return max(0.0, min(100.0, score))
+
+def _full_sweep(bws: np.ndarray, thr: float, pl: float, lat: float, jit: float) -> Tuple[np.ndarray, np.ndarray]:
+    # Same formula as _compute_score, applied to an array of bandwidths,
+    # plus the congestion bucket of each score
+    scores = np.clip(100.0 - pl * 2 - lat * 0.5 - jit * 5 + thr * 20 + np.minimum(bws * 5, 30), 0, 100)
+    return scores, np.searchsorted(_CONGESTION_THRESHOLDS, scores, side="right")
+
+if _NUMBA_AVAILABLE:
+    # Serial on purpose: the handlers run on FastAPI's thread pool, and a
+    # parallel kernel is both slower for a 10-point sweep and unsafe to call
+    # concurrently under Numba's workqueue threading layer
+    @njit(cache=True)
+    def _full_sweep(bws, thr, pl, lat, jit):
+        scores = np.empty_like(bws)
+        cong = np.empty(bws.size, np.int8)
+        for i in range(bws.size):
+            s = 100.0 - pl * 2 - lat * 0.5 - jit * 5 + thr * 20 + min(bws[i] * 5, 30.0)
+            s = 0.0 if s < 0 else (100.0 if s > 100 else s)
+            scores[i] = s
+            bucket = 0
+            for threshold in _CONGESTION_THRESHOLDS:
+                if s >= threshold:
+                    bucket += 1
+            cong[i] = bucket
+        return scores, cong
+
+    # Compile once at import so the first request doesn't pay for it
+    _full_sweep(np.linspace(1.0, 2.0, 10), 0.5, 0.0, 0.0, 0.0)
+
+def _analyze_from_score(score: float) -> Tuple[str, str]:
+    # Congestion level and performance rating depend on the score alone
+    congestion = _CONGESTION_LEVELS[bisect_right(_CONGESTION_THRESHOLDS, score)]
+    rating = _RATING_LEVELS[bisect_right(_RATING_THRESHOLDS, score)]
+    return congestion, rating
+
+def _build_recommendations(thr: float, pl: float, lat: float, jit: float) -> List[str]:
+    # Bandwidth plays no part here, so a bandwidth sweep can reuse one result
     recommendations = []
-    if conditions.packet_loss > 5:
+    if pl > 5:
         recommendations.append("High packet loss detected. Consider checking network hardware or ISP service.")
-    if conditions.latency > 100:
+    if lat > 100:
         recommendations.append("High latency detected. Consider using a closer server or check network routing.")
-    if conditions.jitter > 30:
+    if jit > 30:
         recommendations.append("High jitter detected. QoS settings adjustment recommended.")
-    if conditions.throughput < 0.3:
+    if thr < 0.3:
         recommendations.append("Low throughput detected. Bandwidth upgrade or traffic optimization recommended.")
+    return recommendations
+
+def analyze_network(conditions: NetworkConditions) -> NetworkAnalysis:
+    score = _compute_score(
+        conditions.bandwidth,
+        conditions.throughput,
+        conditions.packet_loss,
+        conditions.latency,
+        conditions.jitter
+    )
+    congestion, rating = _analyze_from_score(score)
+    
+    recommendations = _build_recommendations(
+        conditions.throughput,
+        conditions.packet_loss,
+        conditions.latency,
+        conditions.jitter
+    )
     
     return NetworkAnalysis(
         network_score=score,
@@ -76,39 +184,19 @@ def analyze_network(conditions: NetworkConditions) -> NetworkAnalysis:
         recommendations=recommendations
     )
 
-def get_video_recommendations(conditions: NetworkConditions, score: float) -> Dict:
-    if score >= 80:
-        return {
-            "resolution": "4K (2160p)",
-            "fps": 60,
-            "bitrate": f"{min(conditions.bandwidth * 0.8, 35):.1f} Mbps",
-            "codec": "H.265/HEVC",
-            "streaming_quality": "Ultra High"
-        }
-    elif score >= 60:
-        return {
-            "resolution": "1080p",
-            "fps": 30,
-            "bitrate": f"{min(conditions.bandwidth * 0.7, 15):.1f} Mbps",
-            "codec": "H.264/AVC",
-            "streaming_quality": "High"
-        }
-    elif score >= 40:
-        return {
-            "resolution": "720p",
-            "fps": 30,
-            "bitrate": f"{min(conditions.bandwidth * 0.6, 8):.1f} Mbps",
-            "codec": "H.264/AVC",
-            "streaming_quality": "Medium"
-        }
-    else:
-        return {
-            "resolution": "480p",
-            "fps": 24,
-            "bitrate": f"{min(conditions.bandwidth * 0.5, 4):.1f} Mbps",
-            "codec": "H.264/AVC",
-            "streaming_quality": "Low"
-        }
+def _video_for_bucket(bucket: int, bandwidth: float) -> VideoQuality:
+    resolution, fps, codec, quality, bitrate_mul, bitrate_cap = _VIDEO_PROFILES[bucket]
+    return VideoQuality(
+        resolution=resolution,
+        fps=fps,
+        bitrate=f"{min(bandwidth * bitrate_mul, bitrate_cap):.1f} Mbps",
+        codec=codec,
+        streaming_quality=quality
+    )
+
+def get_video_recommendations(conditions: NetworkConditions, score: float) -> VideoQuality:
+    bucket = bisect_right(_CONGESTION_THRESHOLDS, score)
+    return _video_for_bucket(bucket, conditions.bandwidth)
 
 @app.get("/")
 def read_root():
@@ -125,8 +213,8 @@ def read_root():
         ]
     }
 
-@app.post("/analyze", response_model=Dict[str, Any])
-async def analyze_network_conditions(conditions: NetworkConditions):
+@app.post("/analyze", response_model=AnalyzeResponse, response_model_exclude_none=True)
+def analyze_network_conditions(conditions: NetworkConditions):
     try:
         # Perform network analysis
         analysis = analyze_network(conditions)
@@ -140,89 +228,102 @@ async def analyze_network_conditions(conditions: NetworkConditions):
         if analysis.network_score < 60:
             optimal_bandwidth = conditions.bandwidth * 1.5
         
-        return {
-            "timestamp": datetime.now().isoformat(),
-            "input_conditions": conditions.dict(),
-            "analysis_results": {
-                "network_score": analysis.network_score,
-                "congestion_level": analysis.congestion_level,
-                "performance_rating": analysis.performance_rating,
-                "recommendations": analysis.recommendations
-            },
-            "optimization": {
-                "current_bandwidth": conditions.bandwidth,
-                "recommended_bandwidth": optimal_bandwidth,
-                "potential_improvement": f"{min((optimal_bandwidth/conditions.bandwidth - 1) * 100, 100):.1f}%"
-            },
-            "video_streaming": video_rec,
-            "status": "success"
-        }
+        return AnalyzeResponse(
+            timestamp=datetime.now(timezone.utc),
+            input_conditions=conditions,
+            analysis_results=analysis,
+            optimization=BandwidthOptimization(
+                current_bandwidth=conditions.bandwidth,
+                recommended_bandwidth=optimal_bandwidth,
+                potential_improvement=round(min((optimal_bandwidth/conditions.bandwidth - 1) * 100, 100), 1)
+            ),
+            video_streaming=video_rec,
+            status="success"
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/optimize")
-async def optimize_network(conditions: NetworkConditions):
+@app.post("/optimize", response_model=OptimizeResponse, response_model_exclude_none=True)
+def optimize_network(conditions: NetworkConditions):
     try:
         analysis = analyze_network(conditions)
+        bw, thr, pl, lat, jit = (
+            conditions.bandwidth,
+            conditions.throughput,
+            conditions.packet_loss,
+            conditions.latency,
+            conditions.jitter
+        )
         
         # Generate bandwidth optimization steps
-        min_bw = conditions.bandwidth * 0.5
-        max_bw = conditions.bandwidth * 2.0
+        min_bw = bw * 0.5
+        max_bw = bw * 2.0
         steps = np.linspace(min_bw, max_bw, 10)
         
-        optimization_steps = []
-        for bw in steps:
-            test_conditions = conditions.dict()
-            test_conditions['bandwidth'] = float(bw)
-            test_analysis = analyze_network(NetworkConditions(**test_conditions))
-            
-            # Get video recommendations for this bandwidth
-            video_rec = get_video_recommendations(NetworkConditions(**test_conditions), test_analysis.network_score)
-            
-            optimization_steps.append({
-                "bandwidth": float(bw),
-                "predicted_score": float(test_analysis.network_score),
-                "congestion_level": test_analysis.congestion_level,
-                "video_quality": video_rec
-            })
+        # Score every bandwidth step in a single vectorized pass
+        scores, buckets = _full_sweep(steps, thr, pl, lat, jit)
+        
+        optimization_steps = [
+            OptimizationStep(
+                bandwidth=step_bw,
+                predicted_score=score,
+                congestion_level=_CONGESTION_LEVELS[bucket],
+                video_quality=_video_for_bucket(bucket, step_bw)
+            )
+            for step_bw, score, bucket in zip(steps.tolist(), scores.tolist(), buckets.tolist())
+        ]
         
-        optimal_step = max(optimization_steps, key=lambda x: x['predicted_score'])
+        idx = int(scores.argmax())
+        optimal_step = optimization_steps[idx]
+        optimal_bw = optimal_step.bandwidth
+        optimal_score = optimal_step.predicted_score
         
         # Calculate congestion reduction
         initial_congestion = 100 - analysis.network_score
-        optimal_congestion = 100 - optimal_step['predicted_score']
+        optimal_congestion = 100 - optimal_score
         congestion_reduction = initial_congestion - optimal_congestion
         
-        return {
-            "timestamp": datetime.now().isoformat(),
-            "current_conditions": {
-                "bandwidth": conditions.bandwidth,
-                "throughput": conditions.throughput,
-                "packet_loss": conditions.packet_loss,
-                "latency": conditions.latency,
-                "jitter": conditions.jitter,
-                "current_congestion": f"{initial_congestion:.1f}%",
-                "current_score": analysis.network_score
-            },
-            "optimal_configuration": {
-                "bandwidth": optimal_step['bandwidth'],
-                "predicted_score": optimal_step['predicted_score'],
-                "predicted_congestion": optimal_step['congestion_level'],
-                "congestion_reduction": f"{congestion_reduction:.1f}%",
-                "video_quality": optimal_step['video_quality'],
-                "performance_metrics": {
-                    "bandwidth_improvement": f"{((optimal_step['bandwidth']/conditions.bandwidth - 1) * 100):.1f}%",
-                    "quality_improvement": f"{(optimal_step['predicted_score'] - analysis.network_score):.1f}%",
-                    "network_efficiency": f"{(optimal_step['predicted_score']/optimal_step['bandwidth']):.1f} score/Mbps"
-                }
-            },
-            "step_by_step_optimization": optimization_steps,
-            "recommendations": analysis.recommendations,
-            "status": "success"
-        }
+        return OptimizeResponse(
+            timestamp=datetime.now(timezone.utc),
+            current_conditions=CurrentConditions(
+                bandwidth=bw,
+                throughput=thr,
+                packet_loss=pl,
+                latency=lat,
+                jitter=jit,
+                current_congestion=round(initial_congestion, 1),
+                current_score=analysis.network_score
+            ),
+            optimal_configuration=OptimalConfiguration(
+                bandwidth=optimal_bw,
+                predicted_score=optimal_score,
+                predicted_congestion=optimal_step.congestion_level,
+                congestion_reduction=round(congestion_reduction, 1),
+                video_quality=optimal_step.video_quality,
+                performance_metrics=PerformanceMetrics(
+                    bandwidth_improvement=round((optimal_bw/bw - 1) * 100, 1),
+                    quality_improvement=round(optimal_score - analysis.network_score, 1),
+                    network_efficiency=round(optimal_score/optimal_bw, 1)
+                )
+            ),
+            step_by_step_optimization=optimization_steps,
+            recommendations=analysis.recommendations,
+            status="success"
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
+    import os
+    import sys
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Multiple workers need an import string; uvloop is POSIX-only
+    uvicorn.run(
+        "index:app",
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+        host="0.0.0.0",
+        port=8000,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=max(1, (os.cpu_count() or 1) // 2)
+    )